@@ -165,6 +165,192 @@ def extract_code(file_path):
 project_content_code = extract_code("repo_clone")
 project_content_code
 
+# %%
+import re
+import zlib
+import random
+import difflib
+
+MINHASH_NUM_PERM = 64
+MINHASH_SHINGLE_SIZE = 5
+LSH_ROWS_PER_BAND = 4
+_MINHASH_PRIME = (1 << 61) - 1
+
+# Fixed seed so signatures stay comparable across runs
+_minhash_rng = random.Random(42)
+_MINHASH_COEFFS = [
+    (_minhash_rng.randrange(1, _MINHASH_PRIME), _minhash_rng.randrange(0, _MINHASH_PRIME))
+    for _ in range(MINHASH_NUM_PERM)
+]
+
+STRING_LITERAL_PATTERN = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`(?:\\.|[^`\\])*`'
+PYTHON_STRING_LITERAL_PATTERN = r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|' + STRING_LITERAL_PATTERN
+
+# Comment syntax per file type; file types not listed here keep all their text
+HASH_COMMENT_PATTERN = r'#[^\n]*'
+SLASH_COMMENT_PATTERN = r'//[^\n]*|/\*[\s\S]*?\*/'
+COMMENT_PATTERNS = {
+    "py": HASH_COMMENT_PATTERN,
+    "rb": HASH_COMMENT_PATTERN,
+    "js": SLASH_COMMENT_PATTERN,
+    "jsx": SLASH_COMMENT_PATTERN,
+    "ts": SLASH_COMMENT_PATTERN,
+    "tsx": SLASH_COMMENT_PATTERN,
+    "java": SLASH_COMMENT_PATTERN,
+    "c": SLASH_COMMENT_PATTERN,
+    "cpp": SLASH_COMMENT_PATTERN,
+    "cs": SLASH_COMMENT_PATTERN,
+    "go": SLASH_COMMENT_PATTERN,
+    "php": SLASH_COMMENT_PATTERN + "|" + HASH_COMMENT_PATTERN,
+}
+
+def normalize_snippet_tokens(content, file_type=None):
+    """
+    Tokenize a code snippet ignoring comments and whitespace.
+
+    Args:
+        content (str): Code snippet
+        file_type (str): File extension used to pick the comment syntax
+
+    Returns:
+        list: Tokens, with each string literal kept whole as a single token
+    """
+    string_pattern = PYTHON_STRING_LITERAL_PATTERN if file_type == "py" else STRING_LITERAL_PATTERN
+    pattern = f"(?P<string>{string_pattern})"
+    if file_type in COMMENT_PATTERNS:
+        pattern += f"|(?P<comment>{COMMENT_PATTERNS[file_type]})"
+    pattern += r"|\w+|[^\w\s]"
+
+    # Strings and comments are matched in the same left-to-right pass so that "//" or "#"
+    # inside a string is not taken for a comment, and quotes inside comments are ignored
+    return [
+        match.group(0)
+        for match in re.finditer(pattern, content)
+        if match.lastgroup != "comment"
+    ]
+
+def create_minhash_signature(content, file_type=None):
+    """
+    Build a MinHash signature over token shingles of a code snippet.
+
+    Args:
+        content (str): Code snippet
+        file_type (str): File extension used to pick the comment syntax
+
+    Returns:
+        list: MINHASH_NUM_PERM integers approximating the snippet's shingle set
+    """
+    tokens = normalize_snippet_tokens(content, file_type)
+    if not tokens:
+        return []
+
+    size = min(MINHASH_SHINGLE_SIZE, len(tokens))
+    shingles = {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+        for i in range(len(tokens) - size + 1)
+    }
+
+    return [
+        min((a * shingle + b) % _MINHASH_PRIME for shingle in shingles)
+        for a, b in _MINHASH_COEFFS
+    ]
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate Jaccard similarity of two snippets from their MinHash signatures"""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+def lsh_band_keys(signature):
+    """Split a MinHash signature into hashable LSH band keys"""
+    return [
+        (start, tuple(signature[start:start + LSH_ROWS_PER_BAND]))
+        for start in range(0, len(signature), LSH_ROWS_PER_BAND)
+    ]
+
+def create_snippet_diff_note(source_content, content, file_type=None, max_changes=5,
+                             max_tokens_per_side=4, max_token_length=30, max_length=200,
+                             max_diff_tokens=500):
+    """
+    Describe token-level differences between a snippet and the near-duplicate it reuses.
+
+    Args:
+        source_content (str): Content of the snippet whose summary is reused
+        content (str): Content of the current snippet
+        file_type (str): File extension used to pick the comment syntax
+        max_changes (int): Maximum number of changes to list
+        max_tokens_per_side (int): Maximum number of tokens shown on each side of a change
+        max_token_length (int): Maximum characters shown of a single token (e.g. a long string)
+        max_length (int): Maximum characters of the whole note
+        max_diff_tokens (int): Largest differing region (in tokens) diffed in detail; larger
+            regions are reported as one change so the note stays cheap on big snippets
+
+    Returns:
+        str: Short note such as "getUser -> getOrder; User -> Order", or "" if identical
+    """
+    source_tokens = normalize_snippet_tokens(source_content, file_type)
+    tokens = normalize_snippet_tokens(content, file_type)
+
+    # Trim the common prefix and suffix so only the differing region is diffed
+    prefix = 0
+    while prefix < min(len(source_tokens), len(tokens)) and source_tokens[prefix] == tokens[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < min(len(source_tokens), len(tokens)) - prefix
+           and source_tokens[-1 - suffix] == tokens[-1 - suffix]):
+        suffix += 1
+    source_tokens = source_tokens[prefix:len(source_tokens) - suffix]
+    tokens = tokens[prefix:len(tokens) - suffix]
+
+    if not source_tokens and not tokens:
+        return ""
+    def shorten(side_tokens, empty_text):
+        """Render one side of a change, truncating long token runs and long tokens"""
+        if not side_tokens:
+            return empty_text
+        shown = [
+            token if len(token) <= max_token_length else token[:max_token_length] + "..."
+            for token in side_tokens[:max_tokens_per_side]
+        ]
+        if len(side_tokens) > max_tokens_per_side:
+            shown.append("...")
+        return " ".join(shown)
+
+    # SequenceMatcher is quadratic, so a large differing region is reported as a single change
+    if max(len(source_tokens), len(tokens)) > max_diff_tokens:
+        opcodes = [("replace", 0, len(source_tokens), 0, len(tokens))]
+    else:
+        opcodes = difflib.SequenceMatcher(None, source_tokens, tokens, autojunk=False).get_opcodes()
+
+    changes = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            continue
+        old = shorten(source_tokens[i1:i2], "(nothing)")
+        new = shorten(tokens[j1:j2], "(removed)")
+        change = f"{old} -> {new}"
+        if change not in changes:
+            changes.append(change)
+
+    note = ""
+    shown = 0
+    for change in changes[:max_changes]:
+        candidate = f"{note}; {change}" if note else change
+        if len(candidate) > max_length:
+            if not note:
+                # A single oversized change is truncated rather than dropped
+                note = change[:max_length - 3] + "..."
+                shown = 1
+            break
+        note = candidate
+        shown += 1
+
+    remaining = len(changes) - shown
+    if remaining:
+        note += f"; and {remaining} more change{'' if remaining == 1 else 's'}"
+    return note
+
 # %%
 import re
 import copy
@@ -492,18 +678,27 @@ import subprocess
 import json
 import os
 
-def create_summarized_project_code(chunked_project_code):
+def create_summarized_project_code(chunked_project_code, similarity_threshold=0.85):
     """
     Create a summarized version of the chunked project code, recursively summarizing from bottom up.
 
+    Snippets whose estimated similarity to an already summarized snippet is at least
+    similarity_threshold reuse that summary instead of calling the model again, with a
+    note listing how they differ from the summarized snippet.
+
     Args:
         chunked_project_code (dict): Dictionary containing the chunked project structure
+        similarity_threshold (float): Minimum MinHash similarity (0-1) for reusing a summary; None disables reuse
 
     Returns:
         dict: A dictionary with the same structure but with added summaries
     """
     summarized_project_code = copy.deepcopy(chunked_project_code)
 
+    # LSH buckets of already summarized snippets, keyed by MinHash band
+    snippet_lsh_buckets = {}
+    snippet_stats = {"llm_calls": 0, "reused": 0}
+
     # Define prompts for different types of content
     SNIPPET_PROMPT = """You are a code-summarizer now, summarize this code snippet in one to three lines such that:
 1) logic of the summary and code remains the same.
@@ -537,6 +732,10 @@ CONTAINED FILES AND DIRECTORIES SUMMARIES:
 {summaries}
 """
 
+    # Fallback messages returned when the model call fails
+    SUMMARY_FAILED_MESSAGE = "Summary generation failed. Please ensure Ollama is installed and the Mistral model is available."
+    SUMMARY_ERROR_MESSAGE = "An unexpected error occurred during summary generation."
+
     def generate_summary_with_mistral(prompt):
         """
         Generate summary using Ollama Mistral model.
@@ -560,10 +759,36 @@ CONTAINED FILES AND DIRECTORIES SUMMARIES:
         except subprocess.CalledProcessError as e:
             print(f"Error calling Ollama: {e}")
             # Fallback message if Ollama isn't available
-            return "Summary generation failed. Please ensure Ollama is installed and the Mistral model is available."
+            return SUMMARY_FAILED_MESSAGE
         except Exception as e:
             print(f"Unexpected error: {e}")
-            return "An unexpected error occurred during summary generation."
+            return SUMMARY_ERROR_MESSAGE
+
+    def find_near_duplicate(signature):
+        """
+        Find the most similar already summarized snippet above the similarity threshold.
+
+        Args:
+            signature (list): MinHash signature of the snippet
+
+        Returns:
+            dict: The matching index entry, or None if there is no near-duplicate
+        """
+        best_entry, best_similarity = None, 0.0
+        for band_key in lsh_band_keys(signature):
+            for entry in snippet_lsh_buckets.get(band_key, []):
+                similarity = estimate_similarity(signature, entry["minhash"])
+                if similarity > best_similarity:
+                    best_entry, best_similarity = entry, similarity
+
+        if best_entry is not None and best_similarity >= similarity_threshold:
+            return best_entry
+        return None
+
+    def add_to_lsh_index(entry):
+        """Register a freshly summarized snippet in the LSH buckets"""
+        for band_key in lsh_band_keys(entry["minhash"]):
+            snippet_lsh_buckets.setdefault(band_key, []).append(entry)
 
     def summarize_node(node, path=""):
         """
@@ -588,6 +813,29 @@ CONTAINED FILES AND DIRECTORIES SUMMARIES:
                     # Process all snippets
                     for snippet_key, snippet_data in node["snippets"].items():
                         if "content" in snippet_data:
+                            snippet_path = f"{path}/{snippet_key}"
+                            # Fingerprint the snippet so near-duplicates can share one summary
+                            signature = []
+                            if similarity_threshold is not None:
+                                signature = create_minhash_signature(snippet_data["content"], node.get("file_type"))
+
+                            # Reuse the summary of a near-duplicate snippet if there is one
+                            duplicate = None
+                            if signature:
+                                duplicate = find_near_duplicate(signature)
+
+                            if duplicate is not None:
+                                summary = duplicate["summary"]
+                                # Always note differences so the summary still describes this exact code
+                                diff_note = create_snippet_diff_note(duplicate["content"], snippet_data["content"], node.get("file_type"))
+                                if diff_note:
+                                    summary = f"{summary}\nDifferences: {diff_note}"
+
+                                snippet_data["reused_from"] = duplicate["path"]
+                                snippet_data["summary"] = summary
+                                snippet_stats["reused"] += 1
+                                continue
+
                             # Generate prompt for this snippet
                             prompt = SNIPPET_PROMPT.format(code=snippet_data["content"])
 
@@ -596,10 +844,20 @@ CONTAINED FILES AND DIRECTORIES SUMMARIES:
 
                             # Generate the summary
                             summary = generate_summary_with_mistral(prompt)
+                            snippet_stats["llm_calls"] += 1
 
                             # Add the summary to the snippet data
                             snippet_data["summary"] = summary
 
+                            # Only successful summaries may be shared with near-duplicates
+                            if signature and summary not in (SUMMARY_FAILED_MESSAGE, SUMMARY_ERROR_MESSAGE):
+                                add_to_lsh_index({
+                                    "path": snippet_path,
+                                    "content": snippet_data["content"],
+                                    "minhash": signature,
+                                    "summary": summary
+                                })
+
                     # Now summarize the file based on its snippets
                     snippet_summaries = []
                     for snippet_key, snippet_data in node["snippets"].items():
@@ -656,6 +914,12 @@ CONTAINED FILES AND DIRECTORIES SUMMARIES:
     # Start the summarization process from the root
     summarize_node(summarized_project_code)
 
+    total_snippets = snippet_stats["llm_calls"] + snippet_stats["reused"]
+    if total_snippets:
+        saved_share = 100 * snippet_stats["reused"] / total_snippets
+        print(f"Snippet summaries: {snippet_stats['llm_calls']} LLM calls, "
+              f"{snippet_stats['reused']} reused from near-duplicates ({saved_share:.1f}% of calls saved)")
+
     return summarized_project_code
 
 # Example usage: